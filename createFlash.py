@@ -21,11 +21,33 @@ which syllable/tone/speaker combos are missing.
 from __future__ import annotations
 
 import json
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
-import xml.etree.ElementTree as ET
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
+try:
+    from lxml import etree as ET
+
+    # lxml's iterparse takes parser options directly as keyword arguments.
+    _ITERPARSE_KW: Dict = {
+        "collect_ids": False,
+        "huge_tree": False,
+        "remove_comments": True,
+        "remove_pis": True,
+    }
+except ImportError:  # pragma: no cover - stdlib fallback
+    import xml.etree.ElementTree as ET
+
+    _ITERPARSE_KW = {}
 
 ROOT = Path(__file__).parent
 AUDIO_DIR = ROOT / "tone_perfect"
@@ -35,6 +57,11 @@ OUTPUT_PATH = ROOT / "syllables.json"
 SPEAKERS = ["FV1", "FV2", "FV3", "MV1", "MV2", "MV3"]
 TONES = ["1", "2", "3", "4"]
 
+_PARALLEL_MIN_FILES = 256  # below this, build_index parses XML without a process pool
+
+_FNAME_RE = re.compile(r"(.+?)([1-4])_([A-Za-z]{2}\d)_MP3\.mp3$")
+_NORM_TABLE = str.maketrans({"ü": "v", "Ü": "v"})
+
 # Raw syllable list copied from user (with headings). We'll normalize it.
 RAW_SYLLABLES = """
 A
@@ -475,28 +502,84 @@ def _normalize_syllable(line: str) -> Optional[str]:
     # Drop headings (single uppercase letter or digraph labels).
     if line.isupper():
         return None
-    line = re.sub(r"\s*\(.*?\)", "", line)  # strip parentheses content (and preceding space)
+    # Strip parentheses content (and preceding space).
+    while "(" in line:
+        head, _, rest = line.partition("(")
+        _, close, tail = rest.partition(")")
+        if not close:
+            break
+        line = head.rstrip() + tail
     line = line.strip()
     if not line:
         return None
-    # Convert ü to v to match Tone Perfect filenames.
-    line = line.replace("ü", "v").replace("Ü", "v")
-    line = line.lower()
-    # Keep only letters
-    line = re.sub(r"[^a-z]", "", line)
+    # Convert ü to v to match Tone Perfect filenames, then keep only letters.
+    line = line.lower().translate(_NORM_TABLE)
+    line = "".join(c for c in line if c.isalpha() and c.isascii())
     return line or None
 
 
 def load_syllable_list(raw: str = RAW_SYLLABLES) -> List[str]:
     out: List[str] = []
+    seen: Set[str] = set()
     for line in raw.splitlines():
         norm = _normalize_syllable(line)
-        if norm and norm not in out:
+        if norm and norm not in seen:
+            seen.add(norm)
             out.append(norm)
     return out
 
 
-SYLLABLES = load_syllable_list()
+# Normalized from RAW_SYLLABLES. After editing the raw list, regenerate with
+# `python -c "import createFlash; print(createFlash.load_syllable_list())"`.
+SYLLABLES: Tuple[str, ...] = (
+    "a", "ai", "an", "ang", "ao",
+    "ba", "bai", "ban", "bang", "bao", "bei", "ben", "beng", "bi", "bian", "biao", "bie", "bin",
+    "bing", "bo", "bu",
+    "ca", "cai", "can", "cang", "cao", "ce", "cen", "ceng", "ci", "cong", "cou", "cu", "cuan",
+    "cui", "cun", "cuo",
+    "cha", "chai", "chan", "chang", "chao", "che", "chen", "cheng", "chi", "chong", "chou",
+    "chu", "chua", "chuai", "chuan", "chuang", "chui", "chun", "chuo",
+    "da", "dai", "dan", "dang", "dao", "de", "deng", "di", "dia", "dian", "diao", "die", "ding",
+    "diu", "dong", "dou", "du", "duan", "dui", "dun", "duo",
+    "e", "ei", "en", "eng", "er",
+    "fa", "fan", "fang", "fei", "fen", "feng", "fo", "fou", "fu",
+    "ga", "gai", "gan", "gang", "gao", "ge", "gei", "gen", "geng", "gong", "gou", "gu", "gua",
+    "guai", "guan", "guang", "gui", "gun", "guo",
+    "ha", "hai", "han", "hang", "hao", "he", "hei", "hen", "heng", "hong", "hou", "hu", "hua",
+    "huai", "huan", "huang", "hui", "hun", "huo",
+    "ji", "jia", "jian", "jiang", "jiao", "jie", "jin", "jing", "jiong", "jiu", "ju", "juan",
+    "jue", "jun",
+    "ka", "kai", "kan", "kang", "kao", "ke", "ken", "keng", "kong", "kou", "ku", "kua", "kuai",
+    "kuan", "kuang", "kui", "kun", "kuo",
+    "la", "lai", "lan", "lang", "lao", "le", "lei", "leng", "li", "lia", "lian", "liang",
+    "liao", "lie", "lin", "ling", "liu", "long", "lou", "lu", "luan", "lun", "luo", "lv", "lve",
+    "ma", "mai", "man", "mang", "mao", "me", "mei", "men", "meng", "mi", "mian", "miao", "mie",
+    "min", "ming", "miu", "mo", "mou", "mu",
+    "na", "nai", "nan", "nang", "nao", "ne", "nei", "nen", "neng", "ni", "nian", "niang",
+    "niao", "nie", "nin", "ning", "niu", "nong", "nu", "nuan", "nun", "nuo", "nv", "nve",
+    "o", "ou",
+    "pa", "pai", "pan", "pang", "pao", "pei", "pen", "peng", "pi", "pian", "piao", "pie", "pin",
+    "ping", "po", "pou", "pu",
+    "qi", "qia", "qian", "qiang", "qiao", "qie", "qin", "qing", "qiong", "qiu", "qu", "quan",
+    "que", "qun",
+    "ran", "rang", "rao", "re", "ren", "reng", "ri", "rong", "rou", "ru", "ruan", "rui", "run",
+    "ruo",
+    "sa", "sai", "san", "sang", "sao", "se", "sen", "seng", "si", "song", "sou", "su", "suan",
+    "sui", "sun", "suo",
+    "sha", "shai", "shan", "shang", "shao", "she", "shei", "shen", "sheng", "shi", "shou",
+    "shu", "shua", "shuai", "shuan", "shuang", "shui", "shun", "shuo",
+    "ta", "tai", "tan", "tang", "tao", "te", "teng", "ti", "tian", "tiao", "tie", "ting",
+    "tong", "tou", "tu", "tuan", "tui", "tun", "tuo",
+    "wa", "wai", "wan", "wang", "wei", "wen", "weng", "wo", "wu",
+    "xi", "xia", "xian", "xiang", "xiao", "xie", "xin", "xing", "xiong", "xiu", "xu", "xuan",
+    "xue", "xun",
+    "ya", "yan", "yang", "yao", "ye", "yi", "yin", "ying", "yo", "yong", "you", "yu", "yuan",
+    "yue", "yun",
+    "za", "zai", "zan", "zang", "zao", "ze", "zei", "zen", "zeng", "zi", "zong", "zou", "zu",
+    "zuan", "zui", "zun", "zuo",
+    "zha", "zhai", "zhan", "zhang", "zhao", "zhe", "zhei", "zhen", "zheng", "zhi", "zhong",
+    "zhou", "zhu", "zhua", "zhuai", "zhuan", "zhuang", "zhui", "zhun", "zhuo",
+)
 
 
 @dataclass
@@ -507,101 +590,139 @@ class AudioMeta:
     meta: Dict
 
 
-def parse_audio_filename(path: Path) -> Tuple[str, str, str]:
+def parse_audio_filename(name: str) -> Tuple[str, str, str]:
     """
     Returns (syllable, tone, speaker) from <syllable><tone>_<speaker>_MP3.mp3.
     """
-    m = re.match(r"(.+?)([1-4])_([A-Za-z]{2}\d)_MP3\.mp3$", path.name)
+    m = _FNAME_RE.match(name)
     if not m:
-        raise ValueError(f"Unrecognized audio filename: {path.name}")
+        raise ValueError(f"Unrecognized audio filename: {name}")
     syllable, tone, speaker = m.groups()
     return syllable, tone, speaker
 
 
+# Length of the pinyin initial keyed by its spelling; digraphs are tried first.
+_INITIAL_LOOKUP: Dict[str, int] = {
+    "zh": 2,
+    "ch": 2,
+    "sh": 2,
+    **{init: 1 for init in "bpmfdtnlgkhjqxrzcsyw"},
+}
+
+
 def split_initial_final(syllable: str) -> Tuple[str, str]:
-    initials = [
-        "zh",
-        "ch",
-        "sh",
-        "b",
-        "p",
-        "m",
-        "f",
-        "d",
-        "t",
-        "n",
-        "l",
-        "g",
-        "k",
-        "h",
-        "j",
-        "q",
-        "x",
-        "r",
-        "z",
-        "c",
-        "s",
-        "y",
-        "w",
-    ]
-    for init in initials:
-        if syllable.startswith(init):
-            return init, syllable[len(init) :]
-    return "", syllable
+    n = _INITIAL_LOOKUP.get(syllable[:2]) or _INITIAL_LOOKUP.get(syllable[:1], 0)
+    return syllable[:n], syllable[n:]
+
+
+@lru_cache(maxsize=None)
+def _xml_files() -> FrozenSet[str]:
+    """
+    Filenames present in XML_DIR, listed once so lookups skip a stat per file.
+    """
+    try:
+        return frozenset(os.listdir(XML_DIR))
+    except FileNotFoundError:
+        return frozenset()
 
 
 def read_custom(identifier: str) -> Tuple[Optional[str], Dict]:
     """
     Returns (path, meta_dict).
     """
-    path = XML_DIR / f"{identifier}_CUSTOM.xml"
-    if not path.exists():
+    fname = f"{identifier}_CUSTOM.xml"
+    if fname not in _xml_files():
         return None, {}
-    root = ET.parse(path).getroot()
-    meta: Dict = {child.tag: child.text or "" for child in root}
-    # collect repeated character_forms
-    meta["character_forms"] = [el.text or "" for el in root.findall("character_forms")]
-    characters = []
-    for el in root.findall("character"):
-        characters.append(
-            {
-                "simplified": el.findtext("simplified", default=""),
-                "traditional": el.findtext("traditional", default=""),
-            }
-        )
+    path = XML_DIR / fname
+    meta: Dict = {}
+    character_forms: List[str] = []
+    characters: List[Dict[str, str]] = []
+    # Stream the file, handling each direct child of the root once it is
+    # complete and clearing it straight after, so no full tree is kept.
+    depth = 0
+    for event, el in ET.iterparse(str(path), events=("start", "end"), **_ITERPARSE_KW):
+        if event == "start":
+            depth += 1
+            continue
+        depth -= 1
+        if depth != 1:
+            continue
+        tag = el.tag
+        meta[tag] = el.text or ""
+        if tag == "character_forms":
+            character_forms.append(el.text or "")
+        elif tag == "character":
+            characters.append(
+                {
+                    "simplified": el.findtext("simplified", default=""),
+                    "traditional": el.findtext("traditional", default=""),
+                }
+            )
+        el.clear()
+    meta["character_forms"] = character_forms
     meta["characters"] = characters
     return str(path.relative_to(ROOT)), meta
 
 
 def read_dc(identifier: str) -> Optional[str]:
-    path = XML_DIR / f"{identifier}_DC.xml"
-    return str(path.relative_to(ROOT)) if path.exists() else None
+    fname = f"{identifier}_DC.xml"
+    return str((XML_DIR / fname).relative_to(ROOT)) if fname in _xml_files() else None
 
 
-def build_index() -> Tuple[Dict[str, Dict[str, Dict[str, Optional[Dict]]]], List[str]]:
-    # Initialize all slots to None
-    index: Dict[str, Dict[str, Dict[str, Optional[Dict]]]] = {
-        syll: {tone: {sp: None for sp in SPEAKERS} for tone in TONES} for syll in SYLLABLES
-    }
+def _parse_one(identifier: str) -> Tuple[str, Optional[str], Dict, Optional[str]]:
+    """
+    Worker for build_index: returns (identifier, custom_path, meta, dc_path).
+    """
+    custom_path, meta = read_custom(identifier)
+    return identifier, custom_path, meta, read_dc(identifier)
+
+
+def build_index() -> Tuple[Dict[Tuple[str, str, str], Dict], List[str]]:
+    """
+    Returns ({(syllable, tone, speaker): entry}, unknown_files).
+
+    Only slots with a recording are stored; `nest_index` expands this into
+    the full syllable → tone → speaker layout with nulls for the gaps.
+    """
+    known = set(SYLLABLES)
+    entries: Dict[Tuple[str, str, str], Dict] = {}
 
     unknown_files: List[str] = []
 
-    for audio_file in AUDIO_DIR.glob("*.mp3"):
+    # scandir hands back plain names; no Path wrapping or relative_to per file.
+    audio_rel = str(AUDIO_DIR.relative_to(ROOT))
+    try:
+        with os.scandir(AUDIO_DIR) as it:
+            audio_names = [de.name for de in it if de.name.endswith(".mp3")]
+    except FileNotFoundError:
+        audio_names = []
+
+    jobs: List[Tuple[str, str, str, str]] = []  # (filename, syllable, tone, speaker)
+
+    for name in audio_names:
         try:
-            syllable, tone, speaker = parse_audio_filename(audio_file)
+            syllable, tone, speaker = parse_audio_filename(name)
         except ValueError:
-            unknown_files.append(audio_file.name)
+            unknown_files.append(name)
             continue
 
         # Skip syllables not in the provided list but record them
-        if syllable not in index:
-            unknown_files.append(audio_file.name)
+        if syllable not in known:
+            unknown_files.append(name)
             continue
 
-        identifier = f"{syllable}{tone}_{speaker}"
-        custom_path, meta = read_custom(identifier)
-        dc_path = read_dc(identifier)
+        jobs.append((name, syllable, tone, speaker))
 
+    # XML parsing is independent per file, so fan it out across processes;
+    # small runs stay in-process rather than pay for worker start-up.
+    identifiers = [f"{syllable}{tone}_{speaker}" for _, syllable, tone, speaker in jobs]
+    if len(identifiers) < _PARALLEL_MIN_FILES:
+        parsed = list(map(_parse_one, identifiers))
+    else:
+        with ProcessPoolExecutor() as ex:
+            parsed = list(ex.map(_parse_one, identifiers, chunksize=64))
+
+    for (name, syllable, tone, speaker), (identifier, custom_path, meta, dc_path) in zip(jobs, parsed):
         if not meta:
             # minimal meta fallback
             initial, final = split_initial_final(syllable)
@@ -616,28 +737,45 @@ def build_index() -> Tuple[Dict[str, Dict[str, Dict[str, Optional[Dict]]]], List
             }
 
         entry = {
-            "audio": str(audio_file.relative_to(ROOT)),
+            "audio": os.path.join(audio_rel, name),
             "custom_xml": custom_path,
             "dc_xml": dc_path,
             "meta": meta,
         }
-        index[syllable][tone][speaker] = entry
+        entries[(syllable, tone, speaker)] = entry
+
+    return entries, unknown_files
+
+
+def nest_index(
+    entries: Dict[Tuple[str, str, str], Dict]
+) -> Dict[str, Dict[str, Dict[str, Optional[Dict]]]]:
+    """
+    Expand flat entries into the syllables.json layout; missing slots are None.
 
-    return index, unknown_files
+    Recordings from speakers outside SPEAKERS are kept after the standard keys.
+    """
+    index: Dict[str, Dict[str, Dict[str, Optional[Dict]]]] = {
+        syll: {tone: {sp: entries.get((syll, tone, sp)) for sp in SPEAKERS} for tone in TONES}
+        for syll in SYLLABLES
+    }
+    known_speakers = set(SPEAKERS)
+    for (syll, tone, sp), entry in entries.items():
+        if sp not in known_speakers:
+            index[syll][tone][sp] = entry
+    return index
 
 
-def summarize(
-    index: Dict[str, Dict[str, Dict[str, Optional[Dict]]]], unknown_files: List[str]
-) -> None:
+def summarize(entries: Dict[Tuple[str, str, str], Dict], unknown_files: List[str]) -> None:
     total_slots = len(SYLLABLES) * len(TONES) * len(SPEAKERS)
-    filled = sum(1 for s in index.values() for t in s.values() for v in t.values() if v is not None)
+    filled = len(entries)
     missing = total_slots - filled
     print(f"Total slots: {total_slots}, filled: {filled}, missing: {missing}")
 
     missing_details = []
-    for syllable, tones in index.items():
-        for tone, speakers in tones.items():
-            missing_sp = [sp for sp, val in speakers.items() if val is None]
+    for syllable in SYLLABLES:
+        for tone in TONES:
+            missing_sp = [sp for sp in SPEAKERS if (syllable, tone, sp) not in entries]
             if missing_sp:
                 missing_details.append((syllable, tone, missing_sp))
 
@@ -656,15 +794,18 @@ def summarize(
 
 
 def write_index(index: Dict[str, Dict[str, Dict[str, Optional[Dict]]]], path: Path = OUTPUT_PATH) -> None:
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(index, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
     with path.open("w", encoding="utf-8") as f:
         json.dump(index, f, ensure_ascii=False, indent=2)
 
 
 def main() -> None:
-    index, unknown = build_index()
-    write_index(index)
+    entries, unknown = build_index()
+    write_index(nest_index(entries))
     print(f"Wrote {OUTPUT_PATH.relative_to(ROOT)}")
-    summarize(index, unknown)
+    summarize(entries, unknown)
 
 
 if __name__ == "__main__":
@@ -18,9 +18,15 @@ from __future__ import annotations
 
 import json
 import random
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
 ROOT = Path(__file__).parent
 QBANK_DIR = ROOT / "Qbank"
 SYLLABLE_INDEX = ROOT / "syllables.json"
@@ -37,17 +43,21 @@ TONE_SYMBOL = {"1": "-", "2": "/", "3": "v", "4": "\\"}
 
 
 def load_syllable_index() -> Dict:
-    return json.loads(SYLLABLE_INDEX.read_text(encoding="utf-8"))
+    raw = SYLLABLE_INDEX.read_bytes()
+    # Both parsers accept UTF-8 bytes, skipping a separate decode pass.
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
 
 
 def load_common() -> List[str]:
     raw = COMMON_PATH.read_text(encoding="utf-8")
     parts = [p.strip().lower() for p in raw.replace("\n", ",").split(",")]
-    seen = []
+    out: List[str] = []
+    seen = set()
     for p in parts:
         if p and p not in seen:
-            seen.append(p)
-    return seen
+            seen.add(p)
+            out.append(p)
+    return out
 
 
 def load_tricky_sets() -> List[Dict]:
@@ -67,17 +77,35 @@ def load_tone_syllables() -> List[str]:
 # ---------- Audio helpers ----------
 
 
-def pick_audio(entry: Dict, tone: str, speaker_order: List[str]) -> Optional[Dict]:
-    """Return the audio dict for the first available speaker in order."""
-    tone_bucket = entry.get(tone, {})
-    for sp in speaker_order:
-        if sp in tone_bucket and tone_bucket[sp]:
-            return tone_bucket[sp]
-    # fallback to any available
-    for val in tone_bucket.values():
-        if val:
-            return val
-    return None
+def build_audio_lookup(index: Dict) -> Dict[str, Dict[str, Dict[str, Dict]]]:
+    """
+    Map syllable → tone → {speaker: audio} holding only recorded slots.
+
+    Speakers are ordered by SPEAKER_CYCLE (any others after), so the first
+    value of a tone bucket is the default pick.
+    """
+    lookup: Dict[str, Dict[str, Dict[str, Dict]]] = {}
+    for syllable, tones in index.items():
+        by_tone: Dict[str, Dict[str, Dict]] = {}
+        for tone, speakers in tones.items():
+            order = SPEAKER_CYCLE + [sp for sp in speakers if sp not in SPEAKER_CYCLE]
+            bucket = {sp: speakers[sp] for sp in order if speakers.get(sp)}
+            if bucket:
+                by_tone[tone] = bucket
+        lookup[syllable] = by_tone
+    return lookup
+
+
+def pick_audio(
+    tones: Dict[str, Dict[str, Dict]], tone: str, preferred: Optional[str] = None
+) -> Optional[Dict]:
+    """Return the preferred speaker's audio, else the first available in SPEAKER_CYCLE order."""
+    bucket = tones.get(tone)
+    if not bucket:
+        return None
+    if preferred in bucket:
+        return bucket[preferred]
+    return next(iter(bucket.values()))
 
 
 def ensure_qbank_dir():
@@ -85,6 +113,9 @@ def ensure_qbank_dir():
 
 
 def write_jsonl(path: Path, items: List[Dict]):
+    if orjson is not None:
+        path.write_bytes(b"".join(orjson.dumps(obj) + b"\n" for obj in items))
+        return
     with path.open("w", encoding="utf-8") as f:
         for obj in items:
             f.write(json.dumps(obj, ensure_ascii=False) + "\n")
@@ -93,15 +124,15 @@ def write_jsonl(path: Path, items: List[Dict]):
 # ---------- Generators ----------
 
 
-def gen_type1(index: Dict, common: List[str]) -> List[Dict]:
+def gen_type1(lookup: Dict, common: List[str]) -> List[Dict]:
     """Hear → identify syllable + tone. Options show full syllable list; commons flagged as important."""
     questions = []
     common_set = set(common)
-    full_pool = sorted(index.keys())
-    for syllable, tones in index.items():
+    full_pool = sorted(lookup.keys())
+    for syllable, tones in lookup.items():
         important = syllable in common_set
         for tone in TONES:
-            audio = pick_audio(tones, tone, ["FV1", "MV1", "FV2", "MV2", "FV3", "MV3"])
+            audio = pick_audio(tones, tone)
             if not audio:
                 continue
             q = {
@@ -118,24 +149,23 @@ def gen_type1(index: Dict, common: List[str]) -> List[Dict]:
     return questions
 
 
-def gen_type2(index: Dict, tricky_sets: List[Dict]) -> List[Dict]:
+def gen_type2(lookup: Dict, tricky_sets: List[Dict]) -> List[Dict]:
     """Match audio ↔ syllable using confusing sets; cycle speakers across items."""
     questions = []
     for set_idx, group in enumerate(tricky_sets):
         syllables = group.get("set", [])
-        speaker_iter = SPEAKER_CYCLE * ((len(syllables) // len(SPEAKER_CYCLE)) + 2)
         pairs = []
         success = True
         for i, syll in enumerate(syllables):
-            tones = index.get(syll)
+            tones = lookup.get(syll)
             if not tones:
                 success = False
                 break
-            speaker = speaker_iter[i]
+            speaker = SPEAKER_CYCLE[i % len(SPEAKER_CYCLE)]
             # prefer tone 1; fallback to 2,3,4
             audio = None
             for tone in TONES:
-                audio = pick_audio(tones, tone, [speaker] + SPEAKER_CYCLE)
+                audio = pick_audio(tones, tone, speaker)
                 if audio:
                     chosen_tone = tone
                     break
@@ -167,15 +197,15 @@ def gen_type2(index: Dict, tricky_sets: List[Dict]) -> List[Dict]:
     return questions
 
 
-def gen_type3(index: Dict, tone_syllables: List[str]) -> List[Dict]:
+def gen_type3(lookup: Dict, tone_syllables: List[str]) -> List[Dict]:
     """Tone discrimination: 4 distinct tones + 1 duplicate card."""
     questions = []
     for syll in tone_syllables:
-        entry = index.get(syll)
+        entry = lookup.get(syll)
         if not entry:
             continue
         # collect available tones
-        available_tones = [t for t in TONES if pick_audio(entry, t, SPEAKER_CYCLE)]
+        available_tones = [t for t in TONES if pick_audio(entry, t)]
         if len(available_tones) < 4:
             continue
         base_tones = available_tones[:4]  # assume full coverage
@@ -185,7 +215,7 @@ def gen_type3(index: Dict, tone_syllables: List[str]) -> List[Dict]:
 
         cards = []
         for idx, tone in enumerate(tone_sequence):
-            audio = pick_audio(entry, tone, SPEAKER_CYCLE)
+            audio = pick_audio(entry, tone)
             cards.append(
                 {
                     "card_id": f"{syll}_{tone}_{idx}",
@@ -214,18 +244,21 @@ def gen_type3(index: Dict, tone_syllables: List[str]) -> List[Dict]:
 
 def main():
     ensure_qbank_dir()
-    index = load_syllable_index()
+    lookup = build_audio_lookup(load_syllable_index())
     common = load_common()
     tricky_sets = load_tricky_sets()
     tone_syllables = load_tone_syllables()
 
-    type1 = gen_type1(index, common)
-    type2 = gen_type2(index, tricky_sets)
-    type3 = gen_type3(index, tone_syllables)
-
-    write_jsonl(QBANK_DIR / "type1.json", type1)
-    write_jsonl(QBANK_DIR / "type2.json", type2)
-    write_jsonl(QBANK_DIR / "type3.json", type3)
+    # Hand each finished bank to a writer thread so its I/O overlaps the next generator.
+    with ThreadPoolExecutor(max_workers=3) as writer:
+        type1 = gen_type1(lookup, common)
+        pending = [writer.submit(write_jsonl, QBANK_DIR / "type1.json", type1)]
+        type2 = gen_type2(lookup, tricky_sets)
+        pending.append(writer.submit(write_jsonl, QBANK_DIR / "type2.json", type2))
+        type3 = gen_type3(lookup, tone_syllables)
+        pending.append(writer.submit(write_jsonl, QBANK_DIR / "type3.json", type3))
+        for fut in pending:
+            fut.result()  # re-raise any write error
 
     print(f"type1: {len(type1)} questions")
     print(f"type2: {len(type2)} questions")
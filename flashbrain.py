@@ -16,16 +16,24 @@ from __future__ import annotations
 
 import json
 import math
+import os
 import time
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
 
 ROOT = Path(__file__).parent
 QUESTION_BANK = ROOT / "question_bank.jsonl"
 PROGRESS_LOG = ROOT / "progress.jsonl"
 
+_LN05_OVER_18 = math.log(0.5) / 18.0  # decay rate for an 18h half-life
+
 
 # ---------- Data models ----------
 
@@ -42,6 +50,17 @@ class Question:
         return cls(id=raw["id"], type=raw["type"], tags=raw.get("tags", []), payload=raw)
 
 
+def _history_fields(raw: Dict) -> Tuple[str, int, float, bool, float]:
+    """Coerce a raw progress record to (question_id, attempts, seconds, correct, timestamp)."""
+    return (
+        raw["question_id"],
+        int(raw.get("attempts", 1)),
+        float(raw.get("seconds", 0.0)),
+        bool(raw.get("correct", False)),
+        float(raw.get("timestamp", time.time())),
+    )
+
+
 @dataclass
 class History:
     question_id: str
@@ -52,13 +71,15 @@ class History:
 
     @classmethod
     def from_dict(cls, raw: Dict) -> "History":
-        return cls(
-            question_id=raw["question_id"],
-            attempts=int(raw.get("attempts", 1)),
-            seconds=float(raw.get("seconds", 0.0)),
-            correct=bool(raw.get("correct", False)),
-            timestamp=float(raw.get("timestamp", time.time())),
-        )
+        return cls(*_history_fields(raw))
+
+
+@dataclass
+class QuestionStats:
+    attempts: int
+    incorrect: int
+    last_seconds: float
+    last_timestamp: float
 
 
 # ---------- IO helpers ----------
@@ -91,6 +112,26 @@ def load_history(path: Path = PROGRESS_LOG) -> List[History]:
     return records
 
 
+def load_stats(path: Path = PROGRESS_LOG) -> Dict[str, QuestionStats]:
+    """
+    Stream the progress log straight into per-question aggregates.
+
+    Equivalent to `aggregate_history(load_history(path))` but never builds
+    `History` objects, which is all the scheduler needs.
+    """
+    agg: Dict[str, QuestionStats] = {}
+    if not path.exists():
+        return agg
+    loads = orjson.loads if orjson is not None else json.loads
+    with path.open("rb") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            _fold_record(agg, *_history_fields(loads(line)))
+    return agg
+
+
 def record_result(question_id: str, attempts: int, seconds: float, correct: bool, path: Path = PROGRESS_LOG) -> None:
     entry = {
         "question_id": question_id,
@@ -99,48 +140,89 @@ def record_result(question_id: str, attempts: int, seconds: float, correct: bool
         "correct": correct,
         "timestamp": time.time(),
     }
-    with path.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(entry) + "\n")
+    record_results([entry], path)
+
+
+def record_results(entries: List[Dict], path: Path = PROGRESS_LOG) -> None:
+    """
+    Append several {question_id, attempts, seconds, correct[, timestamp]}
+    entries with one open and write; a missing timestamp defaults to now.
+    """
+    if not entries:
+        return
+    now = time.time()
+    rows = [entry if "timestamp" in entry else {**entry, "timestamp": now} for entry in entries]
+    if orjson is not None:
+        data = b"".join(orjson.dumps(row) + b"\n" for row in rows)
+    else:
+        data = "".join(json.dumps(row) + "\n" for row in rows).encode("utf-8")
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view) :]
+    finally:
+        os.close(fd)
 
 
 # ---------- Scoring ----------
 
 
-def _last_seen(history: List[History], qid: str) -> Optional[History]:
-    filtered = [h for h in history if h.question_id == qid]
-    return max(filtered, key=lambda h: h.timestamp) if filtered else None
+def _fold_record(
+    agg: Dict[str, QuestionStats], qid: str, attempts: int, seconds: float, correct: bool, timestamp: float
+) -> None:
+    stats = agg.get(qid)
+    if stats is None:
+        agg[qid] = QuestionStats(
+            attempts=attempts,
+            incorrect=0 if correct else 1,
+            last_seconds=seconds,
+            last_timestamp=timestamp,
+        )
+        return
+    stats.attempts += attempts
+    if not correct:
+        stats.incorrect += 1
+    if timestamp > stats.last_timestamp:  # earliest record wins ties
+        stats.last_seconds = seconds
+        stats.last_timestamp = timestamp
+
 
+def aggregate_history(history: List[History]) -> Dict[str, QuestionStats]:
+    """Fold the history into per-question totals in a single pass."""
+    agg: Dict[str, QuestionStats] = {}
+    for h in history:
+        _fold_record(agg, h.question_id, h.attempts, h.seconds, h.correct, h.timestamp)
+    return agg
 
-def compute_priority(question: Question, history: List[History], now: float) -> float:
-    last = _last_seen(history, question.id)
 
+def compute_priority(question: Question, stats: Optional[QuestionStats], now: float) -> float:
     tricky_bonus = 0.25 if "tricky" in question.tags else 0.0
 
-    if not last:
+    if not stats:
         return 5.0 + tricky_bonus  # unseen items float near the top
 
-    attempts = sum(h.attempts for h in history if h.question_id == question.id)
-    incorrect = sum(1 for h in history if h.question_id == question.id and not h.correct)
+    attempts = stats.attempts
+    incorrect = stats.incorrect
 
     miss_factor = 1.0 + incorrect * 1.2 + max(0, attempts - incorrect) * 0.2
-    slow_penalty = min(1.5, (last.seconds / 4.0))  # normalize to ~4s baseline
+    slow_penalty = min(1.5, (stats.last_seconds / 4.0))  # normalize to ~4s baseline
 
-    hours_since = (now - last.timestamp) / 3600.0
-    decay = math.exp(hours_since * math.log(0.5) / 18.0)  # half-life 18h
+    hours_since = (now - stats.last_timestamp) / 3600.0
+    decay = math.exp(hours_since * _LN05_OVER_18)  # half-life 18h
 
     score = (1 + tricky_bonus + slow_penalty) * miss_factor * (1 - decay)
     return score
 
 
 def select_next_question(questions: List[Question], history: List[History]) -> Question:
-    now = time.time()
-    scored: List[Tuple[float, Question]] = []
-    for q in questions:
-        score = compute_priority(q, history, now)
-        scored.append((score, q))
+    return select_with_stats(questions, aggregate_history(history))
+
 
-    scored.sort(key=lambda x: x[0], reverse=True)  # highest score = show sooner
-    return scored[0][1]
+def select_with_stats(questions: List[Question], agg: Dict[str, QuestionStats]) -> Question:
+    now = time.time()
+    # highest score = show sooner; max keeps the first question on ties
+    return max(questions, key=lambda q: compute_priority(q, agg.get(q.id), now))
 
 
 # ---------- CLI helper ----------
@@ -148,8 +230,7 @@ def select_next_question(questions: List[Question], history: List[History]) -> Q
 
 def main():
     questions = load_questions()
-    history = load_history()
-    choice = select_next_question(questions, history)
+    choice = select_with_stats(questions, load_stats())
     print(json.dumps(choice.payload, ensure_ascii=False, indent=2))
 
 